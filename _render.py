@@ -0,0 +1,15 @@
+"""Token-join hot path for the VS Code config generator.
+
+Kept as its own module so it can be compiled with mypyc (see setup.py)
+for tight dev loops that re-run the generator on every config change;
+the compiled extension shadows this file and generate_vscode_files picks
+it up transparently.
+"""
+
+def render(chunks: list[bytes], slots: list[int], values: list[bytes]) -> bytes:
+    """Join literal template chunks with the positional value for each slot."""
+    out = [chunks[0]]
+    for i, idx in enumerate(slots):
+        out.append(values[idx])
+        out.append(chunks[i + 1])
+    return b''.join(out)
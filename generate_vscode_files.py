@@ -16,306 +16,179 @@ Placeholders supported:
 - ${ELF_NAME}
 - ${SVD_FILE}
 
-Run from the workspace root: python3 .vscode/generate_vscode.py
+Run from the workspace root: python3 generate_vscode_files.py
 """
 import json
+import mmap
 import os
 import platform
 import re
 import shutil
 import sys
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson  # SIMD-accelerated JSON parser; optional
+except ImportError:
+    orjson = None
+
+# Token-join hot path; a mypyc-built .so shadows the .py when present (setup.py)
+from _render import render as _render_tokens
+
+# Detect the OS once; platform.system() can hit /proc or shell out on some platforms
+_SYS = platform.system().lower()
+_OS_KEY = 'windows' if 'windows' in _SYS else 'linux'
 
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '.'))
 PLATFORM_FILE = os.path.join(ROOT, 'platform.json')
+# Templates live on disk (not in .vscode, which main() recreates from scratch)
+TEMPLATE_DIR = os.path.join(ROOT, 'templates')
 TEMPLATES = ['c_cpp_properties.json', 'launch.json', 'tasks.json', 'extensions.json']
 
-# Embedded templates — the generator will write these files with platform values
-EMBED_TEMPLATES = {
-    'c_cpp_properties.json': '''{
-    "configurations": [
-        {
-            "name": "Auto",
-            "includePath": [
-                "${workspaceFolder}/**"
-            ],
-            "defines": [
-                "${STM32_DEVICE}",
-                "USE_HAL_DRIVER"
-            ],
-            "compilerPath": "${TOOLCHAIN_GCC}",
-            "cStandard": "c11",
-            "cppStandard": "c++17",
-            "intelliSenseMode": "gcc-arm",
-            "compileCommands": "${COMPILE_COMMANDS}",
-            "configurationProvider": "ms-vscode.cmake-tools"
-        }
-    ],
-    "version": 4
-}
-''',
-
-    'launch.json': '''{
-    "version": "0.2.0",
-    "configurations": [
-        {
-            "name": "Debug (OpenOCD)",
-            "type": "cortex-debug",
-            "request": "launch",
-            "executable": "${workspaceFolder}/${BUILD_DIR}/Debug/${ELF_NAME}.elf",
-
-            "servertype": "openocd",
-            "gdbPath": "${GDB_PATH}",
-
-            "configFiles": [
-                "interface/stlink.cfg",
-                "target/${STM32_TARGET}"
-            ],
-
-            "runToEntryPoint": "main",
-            "svdFile": "${SVD_FILE}",
-            "preLaunchTask": "CMake: Build (Debug)",
-            "postDebugTask": "Kill OpenOCD"
-        },
-        {
-            "name": "Attach (OpenOCD)",
-            "type": "cortex-debug",
-            "request": "attach",
-            "executable": "${workspaceFolder}/${BUILD_DIR}/Debug/${ELF_NAME}.elf",
-
-            "servertype": "openocd",
-            "gdbPath": "${GDB_PATH}",
-
-            "configFiles": [
-                "interface/stlink.cfg",
-                "target/${STM32_TARGET}"
-            ],
-
-            "svdFile": "${SVD_FILE}",
-            "preLaunchTask": "CMake: Build (Debug)",
-            "postDebugTask": "Kill OpenOCD"
-        }
-    ]
-}
-''',
-
-    'tasks.json': '''{
-    "version": "2.0.0",
-    "tasks": [
-        {
-            "label": "CMake: Configure (Debug)",
-            "type": "shell",
-            "command": "cmake",
-            "args": [
-                "--preset",
-                "Debug"
-            ],
-            "group": "build",
-            "problemMatcher": [],
-            "options": {
-                "env": {
-                    "PATH": "${TOOLCHAIN_BIN_PATH}:${env:PATH}"
-                }
-            }
-        },
-        {
-            "label": "CMake: Build (Debug)",
-            "type": "shell",
-            "command": "cmake",
-            "args": [
-                "--build",
-                "${workspaceFolder}/${BUILD_DIR}/Debug",
-                "--config",
-                "Debug",
-                "--target",
-                "all",
-                "-j",
-                "10",
-                "--verbose"
-            ],
-            "group": {
-                "kind": "build",
-                "isDefault": true
-            },
-            "problemMatcher": [
-                "$gcc"
-            ],
-            "dependsOn": [
-                "CMake: Configure (Debug)"
-            ],
-            "options": {
-                "env": {
-                    "PATH": "${TOOLCHAIN_BIN_PATH}:${env:PATH}"
-                }
-            }
-        },
-        {
-            "label": "CMake: Clean",
-            "type": "shell",
-            "command": "cmake",
-            "args": [
-                "--build",
-                "${workspaceFolder}/${BUILD_DIR}/Debug",
-                "--target",
-                "clean"
-            ],
-            "group": "build",
-            "problemMatcher": [],
-            "options": {
-                "env": {
-                    "PATH": "${TOOLCHAIN_BIN_PATH}:${env:PATH}"
-                }
-            }
-        },
-        {
-            "label": "CMake: Configure (Release)",
-            "type": "shell",
-            "command": "cmake",
-            "args": [
-                "--preset",
-                "Release"
-            ],
-            "group": "build",
-            "problemMatcher": [],
-            "options": {
-                "env": {
-                    "PATH": "${TOOLCHAIN_BIN_PATH}:${env:PATH}"
-                }
-            }
-        },
-        {
-            "label": "CMake: Build (Release)",
-            "type": "shell",
-            "command": "cmake",
-            "args": [
-                "--build",
-                "${workspaceFolder}/${BUILD_DIR}/Release",
-                "--config",
-                "Release",
-                "--target",
-                "all",
-                "-j",
-                "10"
-            ],
-            "group": "build",
-            "problemMatcher": [
-                "$gcc"
-            ],
-            "dependsOn": [
-                "CMake: Configure (Release)"
-            ],
-            "options": {
-                "env": {
-                    "PATH": "${TOOLCHAIN_BIN_PATH}:${env:PATH}"
-                }
-            }
-        },
-        {
-            "label": "Flash Firmware (Debug)",
-            "type": "shell",
-            "command": "${OPENOCD_PATH}",
-            "args": [
-                "-f",
-                "interface/stlink.cfg",
-                "-f",
-                "target/${STM32_TARGET}",
-                "-c",
-                "program ${BUILD_DIR}/Debug/${ELF_NAME}.hex reset exit"
-            ],
-            "group": "build",
-            "problemMatcher": [],
-            "dependsOn": [
-                "CMake: Build (Debug)"
-            ],
-            "options": {
-                "cwd": "${workspaceFolder}"
-            }
-        },
-        {
-            "label": "Flash Firmware (Release)",
-            "type": "shell",
-            "command": "${OPENOCD_PATH}",
-            "args": [
-                "-f",
-                "interface/stlink.cfg",
-                "-f",
-                "target/${STM32_TARGET}",
-                "-c",
-                "program ${BUILD_DIR}/Release/${ELF_NAME}.hex reset exit"
-            ],
-            "group": "build",
-            "problemMatcher": [],
-            "dependsOn": [
-                "CMake: Build (Release)"
-            ],
-            "options": {
-                "cwd": "${workspaceFolder}"
-            }
-        }
-        ,
-        {
-            "label": "Kill OpenOCD",
-            "type": "shell",
-            "command": "${KILL_OPENOCD_CMD}",
-            "args": [${KILL_OPENOCD_ARGS}],
-            "problemMatcher": []
-        }
-    ]
-}
-''',
-
-    'extensions.json': '''{
-    "recommendations": [
-        "ms-vscode.cpptools",
-        "ms-vscode.cmake-tools",
-        "marus25.cortex-debug",
-        "ms-vscode.hexeditor"
-    ],
-    "unwantedRecommendations": []
-}
-'''
-}
+# Placeholder keys the generator substitutes (see docstring above)
+KEYS = (
+    'TOOLCHAIN_GCC',
+    'TOOLCHAIN_BIN_PATH',
+    'GDB_PATH',
+    'OPENOCD_PATH',
+    'BUILD_DIR',
+    'COMPILE_COMMANDS',
+    'STM32_DEVICE',
+    'STM32_TARGET',
+    'ELF_NAME',
+    'SVD_FILE',
+    'KILL_OPENOCD_CMD',
+    'KILL_OPENOCD_ARGS',
+)
+_KEY_INDEX = {k: i for i, k in enumerate(KEYS)}
+
+# One compiled alternation so each template is scanned once instead of
+# once per key; unknown ${...} tokens (e.g. ${workspaceFolder}) are left as-is.
+# Bytes pattern, since templates are read as bytes straight from the mmap.
+_PH_RE = re.compile(rb'\$\{(' + '|'.join(map(re.escape, KEYS)).encode('ascii') + rb')\}')
+
+# JSON string escaping for substituted values, done in one C-level pass
+_JSON_ESC = str.maketrans({'\\': '\\\\', '"': '\\"'})
+
+# Patterns for pulling the project name out of CMakeLists.txt
+_RE_CMAKE_PROJECT = re.compile(r'set\s*\(\s*CMAKE_PROJECT_NAME\s+([^\s\)]+)\s*\)')
+_RE_PROJECT = re.compile(r'project\s*\(\s*([^\s\)]+)\s*\)')
+
 
 def load_platform_config():
-    with open(PLATFORM_FILE, 'r', encoding='utf-8') as f:
-        cfg = json.load(f)
-    sysname = platform.system().lower()
-    if 'linux' in sysname:
-        key = 'linux'
-    elif 'windows' in sysname:
-        key = 'windows'
-    else:
-        key = 'linux'
-    return cfg.get(key, cfg.get('linux'))
+    with open(PLATFORM_FILE, 'rb') as f:
+        raw = f.read()
+    cfg = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    return cfg.get(_OS_KEY, cfg.get('linux'))
 
-def detect_elf_name():
-    """Auto-detect the ELF name from CMakeLists.txt by parsing CMAKE_PROJECT_NAME."""
-    cmake_file = os.path.join(ROOT, 'CMakeLists.txt')
-    if not os.path.exists(cmake_file):
-        return None
-    
-    with open(cmake_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
+def _project_name_from(content):
     # Look for set(CMAKE_PROJECT_NAME xxx)
-    match = re.search(r'set\s*\(\s*CMAKE_PROJECT_NAME\s+([^\s\)]+)\s*\)', content)
+    match = _RE_CMAKE_PROJECT.search(content)
     if match:
         return match.group(1)
-    
+
     # Also try to find project(xxx)
-    match = re.search(r'project\s*\(\s*([^\s\)]+)\s*\)', content)
+    match = _RE_PROJECT.search(content)
     if match:
         project_name = match.group(1)
         # Check if it's a variable reference
         if project_name.startswith('${') and project_name.endswith('}'):
             return None  # Already handled by CMAKE_PROJECT_NAME
         return project_name
-    
+
     return None
 
-def replace_placeholders(text, mapping):
-    for k, v in mapping.items():
-        text = text.replace('${' + k + '}', v)
-    return text
+def detect_elf_name():
+    """Auto-detect the ELF name from CMakeLists.txt by parsing CMAKE_PROJECT_NAME."""
+    cmake_file = os.path.join(ROOT, 'CMakeLists.txt')
+    if not os.path.exists(cmake_file):
+        return None
+
+    with open(cmake_file, 'r', encoding='utf-8', errors='ignore') as f:
+        # The project directives sit near the top, so an 8 KiB head read is
+        # normally enough; fall back to the rest of the file on a miss.
+        content = f.read(8192)
+        name = _project_name_from(content)
+        if name is None and len(content) == 8192:
+            name = _project_name_from(content + f.read())
+    return name
+
+def _load_tmpl(name):
+    """mmap the on-disk template — zero-copy and served from the page cache."""
+    with open(os.path.join(TEMPLATE_DIR, name + '.tmpl'), 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+def _compile_template(buf):
+    """Split a template buffer into alternating literal chunks and placeholder slots.
+
+    Returns (chunks, slots) where len(chunks) == len(slots) + 1, each slot is
+    an index into KEYS, and the rendered output is
+    chunks[0] + values[slots[0]] + chunks[1] + ...
+    """
+    chunks = []
+    slots = []
+    pos = 0
+    for m in _PH_RE.finditer(buf):
+        chunks.append(bytes(buf[pos:m.start()]))
+        slots.append(_KEY_INDEX[m.group(1).decode('ascii')])
+        pos = m.end()
+    chunks.append(bytes(buf[pos:]))
+    return chunks, slots
+
+# Templates are loaded and tokenized lazily on first use, then cached, so
+# importing the module costs nothing for tools that never call main().
+_COMPILED_TEMPLATES = {}
+
+def _get_compiled(name):
+    compiled = _COMPILED_TEMPLATES.get(name)
+    if compiled is None:
+        buf = _load_tmpl(name)
+        try:
+            compiled = _COMPILED_TEMPLATES[name] = _compile_template(buf)
+        finally:
+            buf.close()
+    return compiled
+
+def render_template(name, values):
+    """Render a template to bytes; values is positional, ordered as KEYS."""
+    chunks, slots = _get_compiled(name)
+    return _render_tokens(chunks, slots, values)
+
+def _render_and_write(name, values, vscode_dir):
+    """Render one template and write it; returns a status line for the caller.
+
+    Runs on a worker thread, so it must not print itself — interleaved
+    multi-write prints garble the output.
+    """
+    try:
+        data = render_template(name, values)
+    except FileNotFoundError:
+        return f'No template for {name}'
+    if orjson is not None:
+        # Round-trip the rendered bytes: catches substitutions that broke the
+        # JSON (e.g. unescaped Windows backslashes in a path) and emits a
+        # normalized 2-space-indent document for VS Code to parse
+        try:
+            data = orjson.dumps(orjson.loads(data), option=orjson.OPT_INDENT_2) + b'\n'
+        except orjson.JSONDecodeError as exc:
+            return f'Error: generated {name} is not valid JSON: {exc}'
+    path = os.path.join(vscode_dir, name)
+    # Skip the write (and the VS Code file-watcher reload it triggers)
+    # when the file already holds exactly these bytes
+    try:
+        with open(path, 'rb') as f:
+            old = f.read()
+    except OSError:
+        old = None
+    if old == data:
+        return f'Unchanged {path}'
+    # Encode once and issue a single raw write, skipping the text-codec path
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+    return f'Wrote {path}'
 
 def main():
     cfg = load_platform_config()
@@ -327,15 +200,22 @@ def main():
         print(f'Removing existing Debug build directory: {debug_build_dir}')
         shutil.rmtree(debug_build_dir)
 
-    # Ensure .vscode directory exists
+    # Remove stale .vscode entries but keep the files we are about to
+    # regenerate, so the unchanged-skip in _render_and_write can actually
+    # short-circuit the write on warm re-runs
     vscode_dir = os.path.join(ROOT, '.vscode')
-    if os.path.exists(vscode_dir):
-        print(f'Removing existing files in .vscode directory: {vscode_dir}')
-        for file_name in os.listdir(vscode_dir):
-            file_path = os.path.join(vscode_dir, file_name)
-            if os.path.isfile(file_path):
-                os.remove(file_path)
-
+    if os.path.isdir(vscode_dir):
+        # scandir serves the file type from the directory entry, avoiding a
+        # per-entry stat; unchanged entries emit no watcher events at all
+        with os.scandir(vscode_dir) as entries:
+            for entry in entries:
+                if entry.name in TEMPLATES:
+                    continue
+                print(f'Removing stale .vscode entry: {entry.path}')
+                if entry.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                else:
+                    os.remove(entry.path)
     os.makedirs(vscode_dir, exist_ok=True)
 
     # Auto-detect ELF name from CMakeLists.txt if not specified
@@ -359,9 +239,10 @@ def main():
         else:
             toolchain_bin_path = ''
     
-    # OS-aware kill command for OpenOCD (used by the Kill OpenOCD task)
-    sysname = platform.system().lower()
-    if 'windows' in sysname:
+    # OS-aware kill command for OpenOCD (used by the Kill OpenOCD task).
+    # These are ordinary slots in the compiled templates, so they resolve in
+    # the same single join as every other placeholder - no extra pass needed.
+    if _OS_KEY == 'windows':
         kill_cmd = 'taskkill'
         kill_args = '"/IM","openocd.exe","/F"'
     else:
@@ -380,19 +261,25 @@ def main():
         'ELF_NAME': elf_name,
         'SVD_FILE': cfg.get('svd_file', '')
     }
+    # Escape backslashes and quotes so Windows toolchain paths like
+    # C:\gcc-arm\bin\... stay valid inside the JSON string literals. The kill
+    # entries are added afterwards: KILL_OPENOCD_ARGS is raw JSON array
+    # content whose quotes must not be escaped.
+    mapping = {k: v.translate(_JSON_ESC) for k, v in mapping.items()}
     mapping['KILL_OPENOCD_CMD'] = kill_cmd
     mapping['KILL_OPENOCD_ARGS'] = kill_args
 
-    for name in TEMPLATES:
-        template = EMBED_TEMPLATES.get(name)
-        if template is None:
-            print('No embedded template for', name)
-            continue
-        new_text = replace_placeholders(template, mapping)
-        path = os.path.join(vscode_dir, name)
-        with open(path, 'w', encoding='utf-8') as f:
-            f.write(new_text)
-        print('Wrote', path)
+    # Encode the values once into a positional list ordered as KEYS; compiled
+    # slots hold indices, so the render loop does list indexing instead of
+    # dict lookups and the bytes flow straight through to the os.write
+    values = [mapping[k].encode('utf-8') for k in KEYS]
+
+    # Each template writes a distinct path from an immutable values list, so
+    # the four render+write steps can run concurrently to overlap disk I/O;
+    # status lines are printed here so worker output cannot interleave
+    with ThreadPoolExecutor(max_workers=len(TEMPLATES)) as ex:
+        for status in ex.map(lambda name: _render_and_write(name, values, vscode_dir), TEMPLATES):
+            print(status)
 
     print('Generation complete. Reload window in VS Code if necessary.')
 
@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""Optional build for the compiled template renderer.
+
+Compiles _render.py with mypyc into an in-place extension module that
+shadows the pure-Python version:
+
+    pip install mypy setuptools
+    python setup.py build_ext --inplace
+
+generate_vscode_files.py works unchanged without the extension; the
+import machinery simply prefers the .so when it exists.
+"""
+from setuptools import setup
+
+try:
+    from mypyc.build import mypycify
+except ImportError:
+    raise SystemExit('mypyc is required to build the accelerated renderer: pip install mypy')
+
+setup(
+    name='stepperdev-vscode-gen',
+    ext_modules=mypycify(['_render.py']),
+)